@@ -90,6 +90,8 @@ async def async_remove_config_entry_device(
 ) -> bool:
     # reference: https://developers.home-assistant.io/docs/device_registry_index/#removing-devices
     _LOGGER.debug("[%s] Remove device: %s", config_entry.unique_id, device_entry.id)
+    if gateway := hass.data[DOMAIN].get(config_entry.entry_id):
+        gateway.remove_device_entry(device_entry)
     return True
 
 
@@ -99,6 +99,8 @@ _PRESS_EVENTS = [
 ]
 
 EVENT_ENTITY_BUTTON_EVENTS = [ACTION_LONG_PRESS, *_PRESS_EVENTS]
+# keyPressed 的 times 对应的事件，1 -> single_press ... 9 -> nonuple_press
+EVENT_ENTITY_PRESS_EVENT_BY_TIMES = dict(enumerate(_PRESS_EVENTS, start=1))
 EVENT_ENTITY_DIAL_EVENTS = [
     ACTION_LONG_PRESS,
     *_PRESS_EVENTS,
@@ -24,7 +24,7 @@ class TerncyDevice:
         self.profile = profile
         self.entities: list[TerncyEntity] = []
 
-        # self.identifiers = {(DOMAIN, eid)}
+        self.identifiers = {(DOMAIN, eid)}
 
     def set_available(self, available: bool):
         """设备是否可用"""
@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from collections.abc import Callable, Coroutine
-from typing import ForwardRef
+from typing import Any, ForwardRef
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
@@ -21,13 +21,14 @@ from homeassistant.helpers.device_registry import (
     CONNECTION_ZIGBEE,
     format_mac,
 )
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
 if (MAJOR_VERSION, MINOR_VERSION) >= (2023, 9):
     from homeassistant.helpers.device_registry import DeviceInfo
 else:
     from homeassistant.helpers.entity import DeviceInfo
 
-from homeassistant.helpers.typing import UNDEFINED
+from homeassistant.helpers.typing import UNDEFINED, UndefinedType
 from terncy import Terncy
 from terncy.event import Connected, Disconnected, EventMessage
 
@@ -45,7 +46,7 @@ from ..const import (
     DOMAIN,
     EVENT_DATA_CLICK_TIMES,
     EVENT_DATA_SOURCE,
-    EVENT_ENTITY_BUTTON_EVENTS,
+    EVENT_ENTITY_PRESS_EVENT_BY_TIMES,
     HA_CLIENT_ID,
     TERNCY_EVENT_SVC_ADD,
     TERNCY_EVENT_SVC_REMOVE,
@@ -83,6 +84,73 @@ SetupHandler = Callable[
     list[TerncyEntity],
 ]
 
+DEBUG = logging.DEBUG
+
+MAX_QUEUED_REPORTS = 1024
+
+# hass.bus event types
+_EVT_PRESSED = f"{DOMAIN}_{ACTION_PRESSED}"
+_EVT_LONG_PRESS = f"{DOMAIN}_{ACTION_LONG_PRESS}"
+_EVT_ROTATION = f"{DOMAIN}_{ACTION_ROTATION}"
+
+
+def _get_versions(
+    device_data: PhysicalDeviceData,
+) -> tuple[str | UndefinedType, str | UndefinedType]:
+    """(sw_version, hw_version) for the device registry."""
+    sw_version = (
+        str(device_data.get("version")) if "version" in device_data else UNDEFINED
+    )
+    hw_version = (
+        str(device_data.get("hwVersion")) if "hwVersion" in device_data else UNDEFINED
+    )
+    return sw_version, hw_version
+
+
+def _get_suggested_area(
+    room_data: dict[str, str], device_data: PhysicalDeviceData
+) -> str | UndefinedType:
+    """Room name of the device for the device registry."""
+    if device_room := device_data.get("room"):
+        if device_room_name := room_data.get(device_room):
+            return device_room_name
+    return UNDEFINED
+
+
+def _is_report(event) -> bool:
+    return (
+        type(event) is EventMessage
+        and isinstance(event.msg, dict)
+        and event.msg.get("type") == "report"
+        and "entities" in event.msg
+    )
+
+
+class _RemoveListener:
+    """Returned by TerncyGateway.add_listener."""
+
+    __slots__ = ("_listeners", "_eid", "_listener")
+
+    # what @callback sets, HA's is_callback() reads it from the instance
+    _hass_callback = True
+
+    def __init__(
+        self,
+        listeners: dict[str, list[Callable[[list[AttrValue]], None]]],
+        eid: str,
+        listener: Callable[[list[AttrValue]], None],
+    ):
+        self._listeners = listeners
+        self._eid = eid
+        self._listener = listener
+
+    def __call__(self) -> None:
+        if (listeners := self._listeners.get(self._eid)) is not None:
+            try:
+                listeners.remove(self._listener)
+            except ValueError:
+                pass
+
 
 class TerncyGateway:
     """Represents a Terncy Gateway."""
@@ -94,9 +162,20 @@ class TerncyGateway:
         self._stopped = False
 
         self.parsed_devices: dict[str, TerncyDevice] = {}  # key: eid
-        self._listeners: dict[str, set[Callable[[list[AttrValue]], None]]] = {}
+        self._entry_id_by_eid: dict[str, str] = {}  # eid: device_entry.id
+        self._eids_by_did: dict[str, set[str]] = {}  # did: {eid, ...}
+        self._listeners: dict[str, list[Callable[[list[AttrValue]], None]]] = {}
         self.room_data: dict[str, str] = {}  # room_id: room_name
+        self._default_rooms: dict[str, str] = (
+            DEFAULT_ROOMS.get(hass.config.language, DEFAULT_ROOMS.get("en")) or {}
+        )  # HA>=2022.12
         self.scenes: dict[str, TerncyEntity] = {}  # 场景实体们
+        self._dev_reg = dr.async_get(hass)
+        self._ent_reg = er.async_get(hass)
+        # only report messages are bounded, other events are never dropped
+        self._event_queue: asyncio.Queue = asyncio.Queue()
+        self._queued_reports = 0
+        self._dropped_reports = 0
 
         self.name = config_entry.title
         self.mac = format_mac(config_entry.unique_id.replace(TERNCY_HUB_ID_PREFIX, ""))
@@ -110,6 +189,13 @@ class TerncyGateway:
             config_entry.data[CONF_TOKEN],
         )
         self.logger = logging.getLogger(f"{__name__}.{ip}")
+        self._via_device = (DOMAIN, self.unique_id)
+        self._gw_identifiers = {self._via_device}
+        self._gw_connections = {(CONNECTION_NETWORK_MAC, self.mac)}
+        self._scene_device_id = (DOMAIN, f"{self.unique_id}_scenes")
+
+        self.available = True  # 网关连接状态，所有实体共用
+        self.availability_signal = f"{DOMAIN}_{self.unique_id}_availability"
 
         # region 配置项
         self.export_device_groups = config_entry.options.get(
@@ -119,6 +205,23 @@ class TerncyGateway:
 
         # endregion
 
+        self._event_type_dispatch: dict[type, Callable[[Any], None]] = {
+            EventMessage: self._on_event_message,
+            Connected: self._on_connected,
+            Disconnected: self._on_disconnected,
+        }
+        self._msg_type_dispatch: dict[str, Callable[[list], None]] = {
+            "report": self._on_report,
+            "keyPressed": self._on_key_pressed,
+            "keyLongPressed": self._on_key_long_pressed,
+            "rotation": self._on_rotation,
+            "entityAvailable": self._on_entity_available,
+            "entityDeleted": self._on_entity_deleted,
+            "entityCreated": self._on_entity_created,
+            "entityUpdated": self._on_entity_updated,
+            "offline": self._on_offline,
+        }
+
         async def on_hass_stop(event: Event):
             """Stop push updates when hass stops."""
             self.logger.debug("on_hass_stop")
@@ -129,6 +232,8 @@ class TerncyGateway:
     def start(self):
         tern = self.api
         self._stopped = False
+        self._dev_reg = dr.async_get(self.hass)
+        self._ent_reg = er.async_get(self.hass)
 
         def on_terncy_svc_add(event: Event):
             """Terncy service found handler"""
@@ -168,6 +273,8 @@ class TerncyGateway:
             self.logger.debug("Start connection to %s", tern.dev_id)
             self.async_create_background_task(self.api.start(), "Start")
 
+        drain_task = self.async_create_background_task(self._drain_events(), "Events")
+        self.config_entry.async_on_unload(drain_task.cancel)
         tern.register_event_handler(self.terncy_event_handler)
 
     async def stop(self):
@@ -199,21 +306,17 @@ class TerncyGateway:
     def add_listener(
         self, eid: str, listener: Callable[[list[AttrValue]], None]
     ) -> CALLBACK_TYPE:
-        @callback
-        def remove_listener() -> None:
-            # self.logger.debug("remove_listener %s", eid)
-            if eid in self._listeners:
-                self._listeners[eid].discard(listener)
-
         # self.logger.debug("add_listener %s", eid)
-        self._listeners.setdefault(eid, set()).add(listener)
+        listeners = self._listeners.setdefault(eid, [])
+        if listener not in listeners:
+            listeners.append(listener)
 
-        return remove_listener
+        return _RemoveListener(self._listeners, eid, listener)
 
     def update_listeners(self, eid: str, data: list[AttrValue]):
         # self.logger.debug("STATE: %s <= %s", eid, data)
-        if eid in self._listeners:
-            for listener in self._listeners[eid]:
+        if listeners := self._listeners.get(eid):
+            for listener in listeners:
                 listener(data)
         # else:
         #     self.logger.debug("no listener for %s", eid)
@@ -229,134 +332,194 @@ class TerncyGateway:
     # region Event handlers
 
     def terncy_event_handler(self, api: Terncy, event):
-        """Handle event from terncy system."""
-
-        if isinstance(event, EventMessage):
-            msg = event.msg
-            # self.logger.debug("EventMessage: %s", msg)
-            if "entities" not in msg:
-                self.logger.warning("'entities' not found in message!")
+        """Queue event from terncy system, keeps the socket reader unblocked."""
+        if _is_report(event):
+            if self._queued_reports >= MAX_QUEUED_REPORTS:
+                self._dropped_reports += 1
                 return
-
-            msg_data = msg.get("entities", [])
-            event_type = msg.get("type")
-            if event_type == "report":
-                self._on_report(msg_data)
-            elif event_type == "keyPressed":
-                self._on_key_pressed(msg_data)
-            elif event_type == "keyLongPressed":
-                self._on_key_long_pressed(msg_data)
-            elif event_type == "rotation":
-                self._on_rotation(msg_data)
-            elif event_type == "entityAvailable":
-                self._on_entity_available(msg_data)
-            elif event_type == "entityDeleted":
-                self._on_entity_deleted(msg_data)
-            elif event_type == "entityCreated":
-                self._on_entity_created(msg_data)
-            elif event_type == "entityUpdated":
-                self._on_entity_updated(msg_data)
-            elif event_type == "offline":
-                self._on_offline(msg_data)
-            elif event_type is None:
-                self.logger.debug("event type is None, ignore. %s", msg)
-            else:
+            self._queued_reports += 1
+        self._event_queue.put_nowait(event)
+
+    async def _drain_events(self):
+        """Handle queued events in order, merging consecutive report messages."""
+        queue = self._event_queue
+        while True:
+            events = [await queue.get()]
+            while not queue.empty():
+                events.append(queue.get_nowait())
+            self._queued_reports = 0
+            if self._dropped_reports:
                 self.logger.warning(
-                    "unsupported event type: %s, entities: %s",
-                    event_type,
-                    msg_data,
+                    "Event queue was full, dropped %d report messages",
+                    self._dropped_reports,
                 )
+                self._dropped_reports = 0
+
+            report: dict[str, dict[str, AttrValue]] = {}  # eid: {attr: AttrValue}
+            for event in events:
+                try:
+                    if _is_report(event):
+                        for id_attributes in event.msg["entities"]:
+                            attrs = report.setdefault(id_attributes.get("id"), {})
+                            for av in id_attributes.get("attributes", []):
+                                attrs[av["attr"]] = av
+                        continue
+                except Exception:
+                    self.logger.exception("Error merging report: %s", event)
+                    continue
+                if report:
+                    self._handle_report(report)
+                    report = {}
+                self._handle_event(event)
+            if report:
+                self._handle_report(report)
+
+    def _handle_report(self, report: dict[str, dict[str, AttrValue]]):
+        msg_data: ReportMsgData = [
+            {"id": eid, "attributes": list(attrs.values())}
+            for eid, attrs in report.items()
+        ]
+        try:
+            self._on_report(msg_data)
+        except Exception:
+            self.logger.exception("Error handling report: %s", msg_data)
 
-        elif isinstance(event, Connected):
-            self.logger.info("Connected: %s", self.unique_id)
-            self.async_create_task(self.async_refresh_devices())
-
-        elif isinstance(event, Disconnected):
-            self.logger.warning("Disconnected: %s", self.unique_id)
-            for device in self.parsed_devices.values():
-                device.set_available(False)
-            if not self._stopped:
-                self.async_create_background_task(self.reconnect(), "Reconnect")
+    def _handle_event(self, event):
+        try:
+            if handler := self._event_type_dispatch.get(type(event)):
+                handler(event)
+            else:
+                self.logger.warning("Unknown Event: %s", event)
+        except Exception:
+            self.logger.exception("Error handling event: %s", event)
+
+    def _on_event_message(self, event: EventMessage):
+        msg = event.msg
+        # self.logger.debug("EventMessage: %s", msg)
+        if "entities" not in msg:
+            self.logger.warning("'entities' not found in message!")
+            return
 
+        msg_data = msg.get("entities", [])
+        event_type = msg.get("type")
+        if handler := self._msg_type_dispatch.get(event_type):
+            handler(msg_data)
+        elif event_type is None:
+            self.logger.debug("event type is None, ignore. %s", msg)
         else:
-            self.logger.warning("Unknown Event: %s", event)
+            self.logger.warning(
+                "unsupported event type: %s, entities: %s",
+                event_type,
+                msg_data,
+            )
+
+    def _on_connected(self, event: Connected):
+        self.logger.info("Connected: %s", self.unique_id)
+        self.async_create_task(self.async_refresh_devices())
+
+    def _on_disconnected(self, event: Disconnected):
+        self.logger.warning("Disconnected: %s", self.unique_id)
+        self._set_available(False)
+        if not self._stopped:
+            self.async_create_background_task(self.reconnect(), "Reconnect")
+
+    def _set_available(self, available: bool):
+        """Entities consult gateway.available, notify them once, not per device."""
+        if self.available == available:
+            return
+        self.available = available
+        async_dispatcher_send(self.hass, self.availability_signal)
 
     def _on_report(self, msg_data: ReportMsgData):
-        self.logger.debug("EVENT: report: %s", msg_data)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: report: %s", msg_data)
+        listeners = self._listeners
         for id_attributes in msg_data:
-            eid = id_attributes.get("id")
-            attributes = id_attributes.get("attributes", [])
-            self.update_listeners(eid, attributes)
+            # inlined update_listeners
+            if eid_listeners := listeners.get(id_attributes.get("id")):
+                attributes = id_attributes.get("attributes", [])
+                for listener in eid_listeners:
+                    listener(attributes)
 
     def _on_key_pressed(self, msg_data: KeyPressedMsgData):
-        self.logger.debug("EVENT: keyPressed: %s", msg_data)
-        device_registry = dr.async_get(self.hass)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: keyPressed: %s", msg_data)
+        evt_name = _EVT_PRESSED
+        press_events = EVENT_ENTITY_PRESS_EVENT_BY_TIMES
+        events: list[tuple[str, dict[str, Any]]] = []
         for entity_data in msg_data:
             if "attributes" not in entity_data:
                 continue
             eid = entity_data["id"]
             times = entity_data["attributes"][0]["times"]
-            if 1 <= times <= 9:
-                event_type = EVENT_ENTITY_BUTTON_EVENTS[times]
-            else:
-                # never here
-                event_type = ACTION_SINGLE_PRESS
+            # default: never here
+            event_type = press_events.get(times, ACTION_SINGLE_PRESS)
             if device := self.parsed_devices.get(eid):
                 device.trigger_event(event_type, {EVENT_DATA_CLICK_TIMES: times})
-            if device_entry := device_registry.async_get_device(
-                identifiers={(DOMAIN, eid)}
-            ):
-                self.hass.bus.async_fire(
-                    f"{DOMAIN}_{ACTION_PRESSED}",
-                    {
-                        CONF_DEVICE_ID: device_entry.id,
-                        EVENT_DATA_SOURCE: eid,
-                        EVENT_DATA_CLICK_TIMES: times,
-                    },
+            if device_entry_id := self._entry_id_by_eid.get(eid):
+                events.append(
+                    (
+                        evt_name,
+                        {
+                            CONF_DEVICE_ID: device_entry_id,
+                            EVENT_DATA_SOURCE: eid,
+                            EVENT_DATA_CLICK_TIMES: times,
+                        },
+                    )
                 )
+        if events:
+            self.hass.loop.call_soon(self._fire_events, events)
 
     def _on_key_long_pressed(self, msg_data: SimpleMsgData):
-        self.logger.debug("EVENT: keyLongPressed: %s", msg_data)
-        device_registry = dr.async_get(self.hass)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: keyLongPressed: %s", msg_data)
+        evt_name = _EVT_LONG_PRESS
+        events: list[tuple[str, dict[str, Any]]] = []
         for item in msg_data:
             eid = item["id"]
             if device := self.parsed_devices.get(eid):
                 device.trigger_event(ACTION_LONG_PRESS)
-            if device_entry := device_registry.async_get_device(
-                identifiers={(DOMAIN, eid)}
-            ):
-                self.hass.bus.async_fire(
-                    f"{DOMAIN}_{ACTION_LONG_PRESS}",
-                    {
-                        CONF_DEVICE_ID: device_entry.id,
-                        EVENT_DATA_SOURCE: eid,
-                    },
+            if device_entry_id := self._entry_id_by_eid.get(eid):
+                events.append(
+                    (
+                        evt_name,
+                        {CONF_DEVICE_ID: device_entry_id, EVENT_DATA_SOURCE: eid},
+                    )
                 )
+        if events:
+            self.hass.loop.call_soon(self._fire_events, events)
 
     def _on_rotation(self, msg_data: SimpleMsgData):
-        self.logger.debug("EVENT: rotation: %s", msg_data)
-        device_registry = dr.async_get(self.hass)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: rotation: %s", msg_data)
+        evt_name = _EVT_ROTATION
+        events: list[tuple[str, dict[str, Any]]] = []
         for item in msg_data:
             eid = item["id"]
             if device := self.parsed_devices.get(eid):
                 device.trigger_event(ACTION_ROTATION)
-            if device_entry := device_registry.async_get_device(
-                identifiers={(DOMAIN, eid)}
-            ):
-                self.hass.bus.async_fire(
-                    f"{DOMAIN}_{ACTION_ROTATION}",
-                    {
-                        CONF_DEVICE_ID: device_entry.id,
-                        EVENT_DATA_SOURCE: eid,
-                    },
+            if device_entry_id := self._entry_id_by_eid.get(eid):
+                events.append(
+                    (
+                        evt_name,
+                        {CONF_DEVICE_ID: device_entry_id, EVENT_DATA_SOURCE: eid},
+                    )
                 )
+        if events:
+            self.hass.loop.call_soon(self._fire_events, events)
+
+    @callback
+    def _fire_events(self, events: list[tuple[str, dict[str, Any]]]):
+        """Fire the hass.bus events collected from one message."""
+        for event_type, event_data in events:
+            self.hass.bus.async_fire(event_type, event_data)
 
     def _on_entity_available(self, msg_data: EntityAvailableMsgData):
-        self.logger.debug("EVENT: entityAvailable: %s", msg_data)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: entityAvailable: %s", msg_data)
         for device_data in msg_data:
             if device_data["type"] == "device":
-                svc_list = device_data.get("services", [])
-                self.setup_device(device_data, svc_list)
+                self.setup_physical_device(device_data)
             elif device_data["type"] == "token":
                 # do nothing
                 pass
@@ -366,25 +529,22 @@ class TerncyGateway:
                 )
 
     def _on_entity_deleted(self, msg_data: SimpleMsgData):
-        self.logger.debug("EVENT: entityDeleted: %s", msg_data)
-        device_registry = dr.async_get(self.hass)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: entityDeleted: %s", msg_data)
+        device_registry = self._dev_reg
         for item in msg_data:
             did = item["id"]  # did or scene_id
             if did.startswith("scene-"):
-                if scene := self.scenes.get(did):
+                if (scene := self.scenes.pop(did, None)) is not None:
                     scene.set_available(False)
-                    self.scenes.pop(did)
-                    er.async_get(self.hass).async_remove(scene.entity_id)
+                    self._ent_reg.async_remove(scene.entity_id)
             else:
-                will_delete: dict[str, TerncyDevice] = {
-                    eid: device
-                    for eid, device in self.parsed_devices.items()
-                    if did == device.did
-                }
-                for eid, device in will_delete.items():
+                for eid in self._eids_by_did.pop(did, ()):
+                    device = self.parsed_devices.pop(eid)
                     device.set_available(False)
+                    self._entry_id_by_eid.pop(eid, None)
                     if device_entry := device_registry.async_get_device(
-                        identifiers={(DOMAIN, eid)}
+                        identifiers=device.identifiers
                     ):
                         device_registry.async_remove_device(device_entry.id)
                         self.logger.debug(
@@ -392,13 +552,15 @@ class TerncyGateway:
                             device_entry.id,
                             device_entry.name,
                         )
-                    self.parsed_devices.pop(eid)
 
     def _on_entity_updated(self, msg_data: EntityUpdatedMsgData):
-        self.logger.debug("EVENT: entityUpdated: %s", msg_data)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: entityUpdated: %s", msg_data)
+        export_scenes = self.export_scenes
         for item in msg_data:
             if item["type"] == "scene":
-                self.setup_scene(item)
+                if export_scenes:
+                    self.setup_scene(item)
             elif item["type"] == "user":
                 self.logger.debug("type user, ignore.")
             else:
@@ -408,12 +570,17 @@ class TerncyGateway:
                 )
 
     def _on_entity_created(self, msg_data: EntityCreatedMsgData):
-        self.logger.debug("EVENT: entityCreated: %s", msg_data)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: entityCreated: %s", msg_data)
+        export_scenes = self.export_scenes
+        export_device_groups = self.export_device_groups
         for item in msg_data:
             if item["type"] == "scene":
-                self.setup_scene(item)
+                if export_scenes:
+                    self.setup_scene(item)
             elif item["type"] == "devicegroup":
-                self.setup_device_group(item)
+                if export_device_groups:
+                    self.setup_device_group(item)
             else:
                 self.logger.debug(
                     "entityCreated: **UNSUPPORTED TYPE**: %s",
@@ -421,12 +588,12 @@ class TerncyGateway:
                 )
 
     def _on_offline(self, msg_data: SimpleMsgData):
-        self.logger.debug("EVENT: offline: %s", msg_data)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("EVENT: offline: %s", msg_data)
         for device_data in msg_data:
             did = device_data["id"]
-            for device in self.parsed_devices.values():
-                if did == device.did:
-                    device.set_available(False)
+            for eid in self._eids_by_did.get(did, ()):
+                self.parsed_devices[eid].set_available(False)
 
     # endregion
 
@@ -451,49 +618,59 @@ class TerncyGateway:
 
     def add_device(self, eid: str, device: TerncyDevice):
         self.parsed_devices[eid] = device
+        self._eids_by_did.setdefault(device.did, set()).add(eid)
+
+    def remove_device_entry(self, device_entry: dr.DeviceEntry):
+        """Device removed from HA, stop firing bus events with its id."""
+        for domain, eid in device_entry.identifiers:
+            if domain == DOMAIN:
+                self._entry_id_by_eid.pop(eid, None)
 
     def setup_device_group(self, device_group_data: DeviceGroupData):
         # noinspection PyTypeChecker
         self.setup_device(device_group_data, [device_group_data])
 
+    def setup_physical_device(self, device_data: PhysicalDeviceData):
+        if device_data["id"] == self.unique_id:
+            # gateway has no svc_list, only update its details
+            self._ensure_gateway_device(device_data)
+        else:
+            self.setup_device(device_data, device_data.get("services", []))
+
+    def _ensure_gateway_device(self, device_data: PhysicalDeviceData):
+        """Update gateway details, because gateway has no svc_list."""
+        sw_version, hw_version = _get_versions(device_data)
+        suggested_area = _get_suggested_area(self.room_data, device_data)
+
+        self._dev_reg.async_get_or_create(
+            config_entry_id=self.config_entry.entry_id,
+            connections=self._gw_connections,
+            identifiers=self._gw_identifiers,
+            manufacturer=TERNCY_MANU_NAME,
+            model=device_data.get("model"),
+            name=self.name,
+            sw_version=sw_version,
+            hw_version=hw_version,
+            suggested_area=suggested_area,
+        )
+
     def setup_device(self, device_data: PhysicalDeviceData, svc_list: list[SvcData]):
         """Got device data, create devices if not exist or update states."""
 
         model = device_data.get("model")
-        self.logger.debug("setup %s: %s", model, svc_list)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug("setup %s: %s", model, svc_list)
 
         did = device_data["id"]
-        sw_version = (
-            str(device_data.get("version")) if "version" in device_data else UNDEFINED
-        )
-        hw_version = (
-            str(device_data.get("hwVersion"))
-            if "hwVersion" in device_data
-            else UNDEFINED
-        )
+        sw_version, hw_version = _get_versions(device_data)
         online = device_data.get("online", True)
+        suggested_area = _get_suggested_area(self.room_data, device_data)
 
-        suggested_area = UNDEFINED
-
-        if device_room := device_data.get("room"):
-            if device_room_name := self.room_data.get(device_room):
-                suggested_area = device_room_name
-
-        device_registry = dr.async_get(self.hass)
-
-        if did == self.unique_id:
-            # update gateway details, because gateway has no svc_list
-            device_registry.async_get_or_create(
-                config_entry_id=self.config_entry.entry_id,
-                connections={(CONNECTION_NETWORK_MAC, self.mac)},
-                identifiers={(DOMAIN, self.unique_id)},
-                manufacturer=TERNCY_MANU_NAME,
-                model=model,
-                name=self.name,
-                sw_version=sw_version,
-                hw_version=hw_version,
-                suggested_area=suggested_area,
-            )
+        device_registry = self._dev_reg
+        entry_id = self.config_entry.entry_id
+        manufacturer = TERNCY_MANU_NAME
+        via_device = self._via_device
+        room_data = self.room_data
 
         for svc in svc_list:
             eid = svc["id"]
@@ -514,31 +691,32 @@ class TerncyGateway:
 
                 if profile in PROFILES:
                     if svc_room := svc.get("room"):
-                        if svc_room_name := self.room_data.get(svc_room):
+                        if svc_room_name := room_data.get(svc_room):
                             suggested_area = svc_room_name
-                    attrs = [a["attr"] for a in attributes]
+                    attrs = {a["attr"] for a in attributes}
                     descriptions = [
                         description
                         for description in PROFILES.get(profile)
                         if (
                             not description.required_attrs
-                            or set(description.required_attrs).issubset(attrs)
+                            or description.required_attrs.issubset(attrs)
                         )
                     ]
                     if len(descriptions) > 0:
-                        identifiers = {(DOMAIN, eid)}
-                        device_registry.async_get_or_create(
-                            config_entry_id=self.config_entry.entry_id,
+                        identifiers = device.identifiers
+                        device_entry = device_registry.async_get_or_create(
+                            config_entry_id=entry_id,
                             connections={(CONNECTION_ZIGBEE, eid)},
                             identifiers=identifiers,
-                            manufacturer=TERNCY_MANU_NAME,
+                            manufacturer=manufacturer,
                             model=model,
                             name=name,
                             sw_version=sw_version,
                             hw_version=hw_version,
                             suggested_area=suggested_area,
-                            via_device=(DOMAIN, self.unique_id),
+                            via_device=via_device,
                         )
+                        self._entry_id_by_eid[eid] = device_entry.id
                         self.add_device(eid, device)
                         for description in descriptions:
                             entity = create_entity(self, eid, description, attributes)
@@ -566,29 +744,42 @@ class TerncyGateway:
         """Get devices from terncy."""
         self.logger.debug("Fetching data...")
 
+        rooms: list[RoomData] | BaseException
+        devices: list[PhysicalDeviceData] | BaseException
+        device_groups: list[DeviceGroupData] | BaseException
+        scenes: list[SceneData] | BaseException
+        rooms, devices, device_groups, scenes = await asyncio.gather(
+            self._fetch_data("room"),
+            self._fetch_data("device"),
+            self._fetch_data("devicegroup"),
+            self._fetch_data("scene"),
+            return_exceptions=True,
+        )
+
         # room
-        lang = self.hass.config.language  # HA>=2022.12
-        default_rooms = DEFAULT_ROOMS.get(lang, DEFAULT_ROOMS.get("en"))
+        default_rooms = self._default_rooms
         try:
-            rooms: list[RoomData] = await self._fetch_data("room")
+            if isinstance(rooms, BaseException):
+                raise rooms
             self.room_data = {
                 room["id"]: room["name"] or default_rooms.get(room["id"], "")
                 for room in rooms
             }
-            self.logger.debug("ROOM %s: %s", lang, self.room_data)
+            self.logger.debug("ROOM %s: %s", self.hass.config.language, self.room_data)
         except Exception as e:
             self.logger.warning("fetch room error: %s", e)
 
         # device
-        devices: list[PhysicalDeviceData] = await self._fetch_data("device")
+        if isinstance(devices, BaseException):
+            raise devices
         # self.logger.debug("got devices %s", devices)
 
         for device_data in devices:
-            svc_list = device_data.get("services", [])
-            self.setup_device(device_data, svc_list)
+            self.setup_physical_device(device_data)
 
         # device group
-        device_groups: list[DeviceGroupData] = await self._fetch_data("devicegroup")
+        if isinstance(device_groups, BaseException):
+            raise device_groups
         # self.logger.debug("got device_groups %s", device_groups)
 
         if self.export_device_groups:
@@ -596,27 +787,41 @@ class TerncyGateway:
                 self.setup_device_group(device_group_data)
 
         # scene
-        scenes: list[SceneData] = await self._fetch_data("scene")
+        if isinstance(scenes, BaseException):
+            raise scenes
         self.logger.debug("SCENE: %s", scenes)
 
         if self.export_scenes:
             # 创建一个共用的设备，里面放所有的场景开关
-            device_registry = dr.async_get(self.hass)
+            device_registry = self._dev_reg
             device_registry.async_get_or_create(
                 config_entry_id=self.config_entry.entry_id,
-                identifiers={(DOMAIN, f"{self.unique_id}_scenes")},
+                identifiers={self._scene_device_id},
                 manufacturer=TERNCY_MANU_NAME,
                 model="TERNCY-SCENE",
                 name="TERNCY-SCENE",
-                via_device=(DOMAIN, self.unique_id),
+                via_device=self._via_device,
             )
             for scene_data in scenes:
                 self.setup_scene(scene_data)
 
-    def setup_scene(self, scene_data: SceneData):
-        if not self.export_scenes:
-            return
+        # devices/scenes gone from the hub (e.g. deleted while disconnected)
+        seen_dids = {device_data["id"] for device_data in devices}
+        seen_dids.update(device_group_data["id"] for device_group_data in device_groups)
+        for did, eids in self._eids_by_did.items():
+            if did not in seen_dids:
+                for eid in eids:
+                    self.parsed_devices[eid].set_available(False)
+        seen_scene_ids = {scene_data["id"] for scene_data in scenes}
+        for scene_id, entity in self.scenes.items():
+            if scene_id not in seen_scene_ids:
+                entity.set_available(False)
 
+        # devices got their real online state, entities can be available again
+        self._set_available(True)
+
+    def setup_scene(self, scene_data: SceneData):
+        """Callers check export_scenes."""
         scene_id = scene_data["id"]
 
         if len(scene_data.get("actions", [])) == 0:
@@ -640,7 +845,7 @@ class TerncyGateway:
                 icon="mdi:palette",
                 unique_id_prefix=self.unique_id,  # scene_id不是uuid形式的，加个网关id作前缀
             )
-            identifiers = {(DOMAIN, f"{self.unique_id}_scenes")}
+            identifiers = {self._scene_device_id}
             entity = create_entity(self, scene_id, description, init_states)
             entity._attr_device_info = DeviceInfo(identifiers=identifiers)
             ha_add_entity(self.hass, self.config_entry, entity)
@@ -2,6 +2,7 @@ from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -62,8 +63,18 @@ class TerncyEntity(Entity):
         if self.hass:
             self.async_write_ha_state()
 
+    @property
+    def available(self) -> bool:
+        """网关断开时所有实体都不可用"""
+        return self.gateway.available and self._attr_available
+
     async def async_added_to_hass(self) -> None:
         self.async_on_remove(self.gateway.add_listener(self.eid, self.update_state))
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self.gateway.availability_signal, self.async_write_ha_state
+            )
+        )
 
     def _migrate_from_old_entity(self, hass, description: TerncyEntityDescription):
         """Migrate from old entity_id"""
@@ -56,7 +56,7 @@ class TerncyEntityDescription(EntityDescription):
 
     translation_key: str | None = None  # <2023.1 需要这一行，避免报错
 
-    required_attrs: list[str] | None = None
+    required_attrs: frozenset[str] | None = None
     """需要的属性，如果没有这些属性，就不创建实体"""
 
 
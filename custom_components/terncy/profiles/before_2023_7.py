@@ -229,7 +229,7 @@ PROFILES: dict[int, list[TerncyEntityDescription]] = {
         ),
         BatteryDescription(
             name="Battery",
-            required_attrs=["battery"],
+            required_attrs=frozenset({"battery"}),
         ),
         TerncyBinarySensorDescription(
             key="motion",
@@ -237,7 +237,7 @@ PROFILES: dict[int, list[TerncyEntityDescription]] = {
             device_class=BinarySensorDeviceClass.MOTION,
             name="Motion Left",
             value_attr="motionL",
-            required_attrs=["motionL"],
+            required_attrs=frozenset({"motionL"}),
         ),
         TerncyBinarySensorDescription(
             key="motion",
@@ -245,7 +245,7 @@ PROFILES: dict[int, list[TerncyEntityDescription]] = {
             device_class=BinarySensorDeviceClass.MOTION,
             name="Motion Right",
             value_attr="motionR",
-            required_attrs=["motionR"],
+            required_attrs=frozenset({"motionR"}),
         ),
     ],
     PROFILE_DIMMABLE_LIGHT: [
@@ -220,7 +220,7 @@ PROFILES: dict[int, list[TerncyEntityDescription]] = {
             value_attr="motion",
         ),
         BatteryDescription(
-            required_attrs=["battery"],
+            required_attrs=frozenset({"battery"}),
         ),
         TerncyBinarySensorDescription(
             key="motion",
@@ -228,7 +228,7 @@ PROFILES: dict[int, list[TerncyEntityDescription]] = {
             device_class=BinarySensorDeviceClass.MOTION,
             translation_key="motion_left",
             value_attr="motionL",
-            required_attrs=["motionL"],
+            required_attrs=frozenset({"motionL"}),
         ),
         TerncyBinarySensorDescription(
             key="motion",
@@ -236,7 +236,7 @@ PROFILES: dict[int, list[TerncyEntityDescription]] = {
             device_class=BinarySensorDeviceClass.MOTION,
             translation_key="motion_right",
             value_attr="motionR",
-            required_attrs=["motionR"],
+            required_attrs=frozenset({"motionR"}),
         ),
     ],
     PROFILE_DIMMABLE_LIGHT: [
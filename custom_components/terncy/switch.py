@@ -91,7 +91,7 @@ class TerncyWallSwitch(TerncyCommonSwitch):
     def available(self) -> bool:
         if self._disableRelay:
             return False
-        return self._attr_available
+        return super().available
 
 
 class DisableRelaySwitch(TerncyCommonSwitch):
@@ -113,7 +113,7 @@ class DisableRelaySwitch(TerncyCommonSwitch):
     @property
     def available(self) -> bool:
         if self._pure_input:
-            return self._attr_available
+            return super().available
         else:
             return False
 
@@ -140,7 +140,7 @@ class DisabledRelayStatusSwitch(TerncyCommonSwitch):
     @property
     def available(self) -> bool:
         if self._pure_input and self._disableRelay:
-            return self._attr_available
+            return super().available
         else:
             return False
 